@@ -3,14 +3,13 @@
 
 import streamlit as st
 import os
-import pickle
 import numpy as np
-import faiss
 from sentence_transformers import SentenceTransformer, CrossEncoder
 from transformers import pipeline
 import torch
 from datetime import datetime
 import json
+from index_store import INDEX_ROOT, get_watcher
 
 # Page configuration
 st.set_page_config(
@@ -100,39 +99,46 @@ if 'initialized' not in st.session_state:
     st.session_state.initialized = False
     st.session_state.chat_history = []
     st.session_state.query_cache = {}
+    st.session_state.index_version = None
 
 # Load system components
 @st.cache_resource
+def load_models():
+    """Load the embedder, generator and re-ranker (shared across index versions)"""
+    embedder = SentenceTransformer("all-MiniLM-L6-v2")
+    
+    device = 0 if torch.cuda.is_available() else -1
+    generator = pipeline("text2text-generation", model="google/flan-t5-small", device=device, max_length=512)
+    
+    try:
+        reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+    except:
+        reranker = None
+    
+    return {
+        'embedder': embedder,
+        'generator': generator,
+        'reranker': reranker
+    }
+
+@st.cache_resource
+def get_index_watcher():
+    """Load the active index version and start watching for new ones"""
+    return get_watcher(INDEX_ROOT)
+
 def load_rag_system():
     """Load all RAG system components"""
     try:
-        # Load metadata and documents
-        with open("rag_metas.pkl", "rb") as f:
-            data = pickle.load(f)
-            metas = data["metas"]
-            docs = data["docs"]
-        
-        # Load FAISS index
-        index = faiss.read_index("faiss.index")
-        
-        # Load models
-        embedder = SentenceTransformer("all-MiniLM-L6-v2")
-        
-        device = 0 if torch.cuda.is_available() else -1
-        generator = pipeline("text2text-generation", model="google/flan-t5-small", device=device, max_length=512)
-        
-        try:
-            reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
-        except:
-            reranker = None
+        models = load_models()
+        # Take one snapshot per run so a swap never changes the index mid-query
+        snapshot = get_index_watcher().snapshot
         
         return {
-            'docs': docs,
-            'metas': metas,
-            'index': index,
-            'embedder': embedder,
-            'generator': generator,
-            'reranker': reranker
+            'docs': snapshot['docs'],
+            'metas': snapshot['metas'],
+            'index': snapshot['index'],
+            'index_version': snapshot['version'],
+            **models
         }
     except Exception as e:
         st.error(f"Error loading RAG system: {e}")
@@ -200,7 +206,7 @@ def answer_query(query, system, top_k=4):
     """Generate answer for query"""
     try:
         # Check cache
-        cache_key = query.lower().strip()
+        cache_key = f"{system['index_version']}:{query.lower().strip()}"
         if cache_key in st.session_state.query_cache:
             return st.session_state.query_cache[cache_key]
         
@@ -286,6 +292,11 @@ def main():
     if system is None:
         st.stop()
     
+    # Cached answers are only valid for the index version that produced them
+    if st.session_state.index_version != system['index_version']:
+        st.session_state.query_cache = {}
+        st.session_state.index_version = system['index_version']
+    
     # Sidebar
     with st.sidebar:
         st.markdown("### ⚙️ Settings")
@@ -318,6 +329,8 @@ def main():
             st.metric("Embeddings", system['index'].ntotal)
             st.metric("Queries", len(st.session_state.chat_history))
         
+        st.metric("Index Version", system['index_version'])
+        
         st.markdown("---")
         
         # Re-ranker status
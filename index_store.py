@@ -0,0 +1,204 @@
+"""
+Versioned storage for the FAISS index and chunk store.
+
+Layout:
+    indexes/
+    ├── CURRENT                  # name of the active version
+    ├── 20251020-101500-3f9a1c/
+    │   ├── faiss.index
+    │   └── rag_metas.pkl
+    └── ...
+
+New versions are written to a temporary directory and renamed into place,
+then CURRENT is switched with an atomic rename, so readers never observe a
+half-written index. When no CURRENT pointer exists the legacy top-level
+faiss.index / rag_metas.pkl pair is used.
+"""
+
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+import faiss
+
+INDEX_ROOT = "indexes"
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "faiss.index"
+METAS_FILE = "rag_metas.pkl"
+LEGACY_VERSION = "legacy"
+TMP_SUFFIX = ".tmp"
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def read_current_version(root=INDEX_ROOT):
+    """Return the active version name, or None if no pointer exists"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def _current_mtime(root):
+    try:
+        return os.stat(os.path.join(root, CURRENT_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def set_current_version(version, root=INDEX_ROOT):
+    """Atomically point CURRENT at an existing version"""
+    if version.endswith(TMP_SUFFIX):
+        raise ValueError(f"Refusing to activate an unfinished index version: {version}")
+    if not os.path.isdir(os.path.join(root, version)):
+        raise FileNotFoundError(f"Index version not found: {version}")
+    tmp_path = os.path.join(root, CURRENT_FILE + TMP_SUFFIX)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+
+def publish_index(index, docs, metas, root=INDEX_ROOT, version=None):
+    """Write a new index version and make it current. Returns the version name."""
+    os.makedirs(root, exist_ok=True)
+    if version is None:
+        version = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    final_dir = os.path.join(root, version)
+    if os.path.exists(final_dir):
+        raise FileExistsError(f"Index version already exists: {version}")
+
+    tmp_dir = final_dir + TMP_SUFFIX
+    os.makedirs(tmp_dir)
+    try:
+        faiss.write_index(index, os.path.join(tmp_dir, INDEX_FILE))
+        with open(os.path.join(tmp_dir, METAS_FILE), "wb") as f:
+            pickle.dump({"metas": metas, "docs": docs}, f)
+        os.replace(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    set_current_version(version, root)
+    return version
+
+
+def _load_files(index_path, metas_path, version):
+    with open(metas_path, "rb") as f:
+        data = pickle.load(f)
+    index = faiss.read_index(index_path)
+    return {
+        'version': version,
+        'index': index,
+        'docs': data["docs"],
+        'metas': data["metas"]
+    }
+
+
+def load_index_version(version, root=INDEX_ROOT):
+    """Load the index and chunk store for a given version"""
+    if version == LEGACY_VERSION:
+        return _load_files(INDEX_FILE, METAS_FILE, LEGACY_VERSION)
+    version_dir = os.path.join(root, version)
+    return _load_files(
+        os.path.join(version_dir, INDEX_FILE),
+        os.path.join(version_dir, METAS_FILE),
+        version
+    )
+
+
+def load_current_index(root=INDEX_ROOT):
+    """Load the active version, falling back to the legacy top-level files"""
+    return load_index_version(read_current_version(root) or LEGACY_VERSION, root)
+
+
+class IndexWatcher:
+    """Polls CURRENT and swaps in new index versions loaded in the background.
+
+    Readers take ``watcher.snapshot`` once per request and keep using that
+    dict; a swap only replaces the reference, so in-flight queries finish
+    against the version they started with.
+    """
+
+    def __init__(self, root=INDEX_ROOT, poll_interval=5.0):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._snapshot = load_current_index(root)
+        self._failed_version = None
+        self._current_mtime = _current_mtime(root)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot
+
+    @property
+    def version(self):
+        return self.snapshot['version']
+
+    @property
+    def running(self):
+        return self._thread.is_alive() and not self._stop_event.is_set()
+
+    def stop(self):
+        """Stop polling; the current snapshot stays readable"""
+        self._stop_event.set()
+
+    def check_for_update(self):
+        """Load and swap in the current version if it changed. Returns True on swap."""
+        mtime = _current_mtime(self.root)
+        if mtime != self._current_mtime:
+            # CURRENT was rewritten (e.g. set_current_version on a repaired
+            # version), so give a previously failed version another try
+            self._current_mtime = mtime
+            self._failed_version = None
+        version = read_current_version(self.root)
+        if version is None or version == self.version or version == self._failed_version:
+            return False
+        try:
+            snapshot = load_index_version(version, self.root)
+        except Exception as e:
+            # Don't retry a broken version on every poll; wait for CURRENT to be rewritten
+            print(f"⚠️ Could not load index version {version}: {e}")
+            self._failed_version = version
+            return False
+        with self._lock:
+            self._snapshot = snapshot
+        self._failed_version = None
+        print(f"✅ Switched to index version {version}")
+        return True
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                print(f"⚠️ Index watcher error: {e}")
+
+
+def get_watcher(root=INDEX_ROOT, poll_interval=5.0):
+    """Return the running watcher for ``root``, starting one only if needed.
+
+    Keeping one watcher per root at module level means rebuilding a caller's
+    cache (e.g. ``st.cache_resource.clear()``) reuses it instead of leaving
+    an orphaned thread holding its own copy of the index.
+    """
+    key = os.path.abspath(root)
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None or not watcher.running:
+            watcher = IndexWatcher(root, poll_interval)
+            _watchers[key] = watcher
+        return watcher